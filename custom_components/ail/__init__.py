@@ -6,10 +6,9 @@ from dataclasses import dataclass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from custom_components.ail.api_client import AILEnergyClient
-from custom_components.ail.const import DOMAIN
 from custom_components.ail.coordinator import EnergyDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,32 +18,33 @@ type AilConfigEntry = ConfigEntry[RuntimeData]
 
 @dataclass
 class RuntimeData:
-    coordinator: DataUpdateCoordinator
+    coordinator: EnergyDataUpdateCoordinator
 
 
 PLATFORMS = [Platform.SENSOR]
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_setup_entry(hass: HomeAssistant, entry: AilConfigEntry) -> bool:
     """Set up from a config entry."""
+    # A session per entry keeps each account's cookies apart, while the
+    # connections are pooled by Home Assistant's shared connector. It's
+    # detached when the entry is unloaded.
+    session = async_create_clientsession(hass)
+
     # Create coordinator
-    client = AILEnergyClient(entry.data["username"], entry.data["password"])
+    client = AILEnergyClient(entry.data["username"], entry.data["password"], session)
     data_coordinator = EnergyDataUpdateCoordinator(hass, entry, client)
 
     # Get initial data
     await data_coordinator.async_config_entry_first_refresh()
 
-    # Store coordinator
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = data_coordinator
+    # Store coordinator on the entry, Home Assistant drops it on unload
+    entry.runtime_data = RuntimeData(coordinator=data_coordinator)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_unload_entry(hass: HomeAssistant, entry: AilConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
+    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
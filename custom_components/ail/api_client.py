@@ -1,23 +1,50 @@
 import logging
-import re
-from datetime import datetime
-from typing import Optional, List
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from typing import Annotated, List, Optional, Required, TypedDict
 
 import aiohttp
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 _LOGGER = logging.getLogger(__name__)
 
+_HEADERS = {
+    "Cache-Control": "no-cache, max-age=0, must-revalidate",
+    "Location": "/it/base",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+}
 
-class ConsumptionRecord(BaseModel):
-    """Model for a single consumption record."""
+_TOKEN_MARKER = b"aWattgarde.config.token"
+_METER_MARKER = b'"ID":'
 
-    day: Optional[float] = 0.0
-    from_: datetime = Field(..., alias="from")
-    to: datetime
-    is_pending: bool = Field(..., alias="isPending")
-    readings_count: Optional[int] = Field(None, alias="readingsCount")
-    night: Optional[float] = 0.0
+# Readings request fields that are the same for every call
+_READINGS_PAYLOAD = {
+    "scale": "hours",
+    "forceWholeTimeFrame": False,
+    "hoursPrecision": True,
+    "fetchPreviousYearData": False,
+}
+
+# Force a new login once the token gets this old, even if it's still accepted
+TOKEN_MAX_AGE = timedelta(hours=12)
+
+_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+
+class ConsumptionRecord(TypedDict, total=False):
+    """Model for a single consumption record.
+
+    A TypedDict rather than a BaseModel: records are only reached through
+    ConsumptionResponse, so pydantic validates them into plain dicts.
+    """
+
+    day: Optional[float]
+    from_: Required[Annotated[datetime, Field(alias="from")]]
+    to: Required[datetime]
+    is_pending: Required[Annotated[bool, Field(alias="isPending")]]
+    readings_count: Annotated[Optional[int], Field(alias="readingsCount")]
+    night: Optional[float]
 
 
 class ConsumptionResponse(BaseModel):
@@ -25,64 +52,90 @@ class ConsumptionResponse(BaseModel):
 
     response: List[ConsumptionRecord]
 
-    class Config:
-        populate_by_name = True
-        exclude_none = True
-        json_encoders = {datetime: lambda v: v.isoformat()}
+    model_config = ConfigDict(populate_by_name=True)
+
+
+def _extract_token(content: bytes) -> Optional[str]:
+    """Extract the token from `aWattgarde.config.token = "..."` in the login page.
+
+    Every occurrence of the marker is tried, so names that only start with it
+    are skipped. Returns None if the closing quote of the value is missing.
+    """
+    start = content.find(_TOKEN_MARKER)
+    while start != -1:
+        start += len(_TOKEN_MARKER)
+        quote = content.find(b'"', start)
+        if quote == -1:
+            return None
+
+        end = content.find(b'"', quote + 1)
+        if content[start:quote].strip() == b"=" and end > quote + 1:
+            return content[quote + 1 : end].decode()
+        start = content.find(_TOKEN_MARKER, start)
+    return None
+
+
+def _extract_meter_id(content: bytes) -> Optional[str]:
+    """Extract the meter ID from `"ID": 1234` in the login page.
+
+    Every occurrence of the marker is tried, so IDs that aren't numbers are
+    skipped. An ID must be followed by a non-digit, so one cut off at the end
+    of the content isn't returned truncated.
+    """
+    start = content.find(_METER_MARKER)
+    while start != -1:
+        start += len(_METER_MARKER)
+        value = content[start : start + 64].lstrip()
+        digits = len(value) - len(value.lstrip(b"0123456789"))
+        if 0 < digits < len(value):
+            return value[:digits].decode()
+        start = content.find(_METER_MARKER, start)
+    return None
+
+
+class AuthExpired(Exception):
+    """Error to indicate the token is missing, too old or was rejected."""
 
 
 class AILEnergyClient:
-    def __init__(self, email: str, password: str):
+    def __init__(self, email: str, password: str, session: aiohttp.ClientSession):
         self.email = email
         self.password = password
         self.token = None
         self.meter_id = None
-        self.session = None
-        self._headers = {
-            "Cache-Control": "no-cache, max-age=0, must-revalidate",
-            "Location": "/it/base",
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-        }
-
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=self._headers)
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # Owned by the caller, so every account keeps its own cookies while
+        # the connections can still be pooled
+        self.session = session
+        self._token_acquired_at: Optional[float] = None
+        # The login form never changes for a client, encode it once
+        self._login_body = urllib.parse.urlencode(
+            {
+                "AuthenticationMethod": "CustomMemberAuthenticator",
+                "Email": email,
+                "Password": password,
+                "action_dologin": "Accedi",
+            }
+        ).encode()
 
     async def login(self) -> bool:
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self._headers)
-
-        login_payload = {
-            "AuthenticationMethod": "CustomMemberAuthenticator",
-            "Email": self.email,
-            "Password": self.password,
-            "action_dologin": "Accedi",
-        }
-
         async with self.session.post(
             "https://energybuddy.ail.ch/it/Security/LoginForm",
-            data=login_payload,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data=self._login_body,
+            headers={**_HEADERS, "Content-Type": "application/x-www-form-urlencoded"},
             allow_redirects=True,
+            timeout=_TIMEOUT,
         ) as response:
             if response.status == 200:
-                content = await response.text()
-
-                token_match = re.search(
-                    r'aWattgarde\.config\.token\s*=\s*"([^"]+)"', content
-                )
-                if token_match:
-                    self.token = token_match.group(1)
-
-                meter_match = re.search(r'"ID":\s*(\d+)', content)
-                if meter_match:
-                    self.meter_id = meter_match.group(1)
-
-                if self.token and self.meter_id:
+                # Read the whole page: leaving the body half read would drop
+                # the connection instead of releasing it for the readings call
+                content = await response.read()
+                token = _extract_token(content)
+                meter_id = _extract_meter_id(content)
+
+                if token and meter_id:
+                    self.token = token
+                    self.meter_id = meter_id
+                    self._token_acquired_at = time.monotonic()
                     return True
 
             return False
@@ -90,24 +143,30 @@ class AILEnergyClient:
     def meter_id(self) -> Optional[str]:
         return self.meter_id
 
+    @property
+    def logged_in(self) -> bool:
+        """Whether we hold a token that isn't due for renewal yet."""
+        return (
+            self.token is not None
+            and time.monotonic() - self._token_acquired_at
+            < TOKEN_MAX_AGE.total_seconds()
+        )
+
     async def get_consumption_data(
         self, _from: datetime, _to: datetime
     ) -> ConsumptionResponse:
-        _LOGGER.debug(f"Calling API for timedelta {_from} -> {_to}...")
+        _LOGGER.debug("Calling API for timedelta %s -> %s...", _from, _to)
 
-        if not self.token:
-            raise ValueError("Not logged in. Call login() first")
+        if not self.logged_in:
+            raise AuthExpired("Not logged in or token expired. Call login() first")
 
         payload = {
+            **_READINGS_PAYLOAD,
             "meterID": self.meter_id,
-            "scale": "hours",
             "timeFrame": {
-                "from": _from.strftime("%Y-%m-%d %H:%M:%S"),
-                "to": _to.strftime("%Y-%m-%d %H:%M:%S"),
+                "from": _from.isoformat(sep=" ", timespec="seconds"),
+                "to": _to.isoformat(sep=" ", timespec="seconds"),
             },
-            "forceWholeTimeFrame": False,
-            "hoursPrecision": True,
-            "fetchPreviousYearData": False,
         }
 
         params = {"token": self.token}
@@ -115,10 +174,18 @@ class AILEnergyClient:
             "https://energybuddy.ail.ch/api/v2/service/MeterService/getReadingsByScaleAndTimeRange",
             params=params,
             json=payload,
+            headers=_HEADERS,
+            timeout=_TIMEOUT,
         ) as response:
             if response.status == 200:
-                raw_json = await response.json()
-                return ConsumptionResponse(**raw_json)
+                # Let pydantic-core parse the raw bytes, skipping the dict round-trip
+                return ConsumptionResponse.model_validate_json(await response.read())
+            elif response.status in (401, 403):
+                # A concurrent call may have logged in again meanwhile, only
+                # drop the token this request was sent with
+                if self.token == params["token"]:
+                    self.token = None
+                raise AuthExpired(f"Token rejected with status code: {response.status}")
             else:
                 raise ConnectionError(
                     f"Request failed with status code: {response.status}"
@@ -7,8 +7,9 @@ from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
-from . import AILEnergyClient
+from .api_client import AILEnergyClient
 from .const import (
     DOMAIN,
     CONF_USERNAME,
@@ -20,6 +21,46 @@ from .const import (
     NIGHTLY_PRICE_CHF,
 )
 
+# Schemas only depend on constants, build them once
+_USER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_USERNAME): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.TEXT,
+            ),
+        ),
+        vol.Required(CONF_PASSWORD): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.PASSWORD,
+            ),
+        ),
+    }
+)
+
+_TARIFF_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_FIXED_TARIFF, default=False): selector.BooleanSelector(),
+        vol.Required(CONF_PEAK_PRICE, default=DAILY_PRICE_CHF): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=20,
+                step=0.001,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_OFF_PEAK_PRICE, default=NIGHTLY_PRICE_CHF
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=20,
+                step=0.001,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+    }
+)
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for My Integration."""
@@ -36,22 +77,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
         errors = {}
 
-        # Define schema with descriptions
-        schema = vol.Schema(
-            {
-                vol.Required(CONF_USERNAME): selector.TextSelector(
-                    selector.TextSelectorConfig(
-                        type=selector.TextSelectorType.TEXT,
-                    ),
-                ),
-                vol.Required(CONF_PASSWORD): selector.TextSelector(
-                    selector.TextSelectorConfig(
-                        type=selector.TextSelectorType.PASSWORD,
-                    ),
-                ),
-            }
-        )
-
         if user_input is not None:
             try:
                 # Validate the credentials here if possible
@@ -70,7 +95,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="user",
-            data_schema=schema,
+            data_schema=_USER_SCHEMA,
             description_placeholders={
                 "login_url": "https://energybuddy.ail.ch",
                 "account_create_url": "https://energybuddy.ail.ch/it/activation/",
@@ -99,45 +124,24 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except ValueError:
                 errors["base"] = "invalid_price"
 
-        schema = vol.Schema(
-            {
-                vol.Required(
-                    CONF_FIXED_TARIFF, default=False
-                ): selector.BooleanSelector(),
-                vol.Required(
-                    CONF_PEAK_PRICE, default=DAILY_PRICE_CHF
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0,
-                        max=20,
-                        step=0.001,
-                        mode=selector.NumberSelectorMode.BOX,
-                    ),
-                ),
-                vol.Required(
-                    CONF_OFF_PEAK_PRICE, default=NIGHTLY_PRICE_CHF
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0,
-                        max=20,
-                        step=0.001,
-                        mode=selector.NumberSelectorMode.BOX,
-                    ),
-                ),
-            }
-        )
-
         return self.async_show_form(
             step_id="tariff",
-            data_schema=schema,
+            data_schema=_TARIFF_SCHEMA,
             errors=errors,
         )
 
     async def _test_credentials(self, user_input):
         """Test if we can authenticate with the credentials."""
-        client = AILEnergyClient(user_input[CONF_USERNAME], user_input[CONF_PASSWORD])
-        if not await client.login():
-            raise InvalidAuth()
+        # Log in with a fresh session, not one already logged in elsewhere
+        session = async_create_clientsession(self.hass, auto_cleanup=False)
+        try:
+            client = AILEnergyClient(
+                user_input[CONF_USERNAME], user_input[CONF_PASSWORD], session
+            )
+            if not await client.login():
+                raise InvalidAuth()
+        finally:
+            session.detach()
 
 
 class CannotConnect(HomeAssistantError):
@@ -17,6 +17,7 @@ ENERGY_CONSUMPTION_COST_NIGHT_KEY = f"{DOMAIN}:energy_night_consumption_cost"
 # Update interval
 DEFAULT_UPDATE_INTERVAL_HOUR = 1
 CONSUMPTION_DATA_DAYS_TO_FETCH = 14
+HISTORICAL_DATA_MAX_CONCURRENT_REQUESTS = 4
 
 DAILY_PRICE_CHF = 0.2580  # CHF/kWh
 NIGHTLY_PRICE_CHF = 0.2347  # CHF/kWh
@@ -1,8 +1,14 @@
+import asyncio
 import logging
-from dataclasses import dataclass
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from itertools import accumulate, islice
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+import aiohttp
 from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
 from homeassistant.components.recorder.statistics import (
@@ -13,9 +19,14 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api_client import AILEnergyClient, ConsumptionResponse
+from .api_client import (
+    AILEnergyClient,
+    AuthExpired,
+    ConsumptionRecord,
+    ConsumptionResponse,
+)
 from .const import (
     DOMAIN,
     ENERGY_NIGHT_CONSUMPTION_KEY,
@@ -23,6 +34,7 @@ from .const import (
     ENERGY_CONSUMPTION_KEY,
     DEFAULT_UPDATE_INTERVAL_HOUR,
     CONSUMPTION_DATA_DAYS_TO_FETCH,
+    HISTORICAL_DATA_MAX_CONCURRENT_REQUESTS,
     DAILY_PRICE_CHF,
     NIGHTLY_PRICE_CHF,
     ENERGY_CONSUMPTION_COST_DAY_KEY,
@@ -32,8 +44,91 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Errors expected when the API is unreachable or returns unexpected data,
+# anything else is a bug and should propagate. AuthExpired only gets here
+# when the token is rejected again right after a successful login.
+_FETCH_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    AuthExpired,
+    ConnectionError,
+    ValueError,
+)
+
+# Statistics can be cleared from the recorder meanwhile, don't trust the cached
+# last statistics for longer than this
+_LAST_STATS_MAX_AGE = timedelta(minutes=30)
+
+# Metadata fields shared by every statistic
+_BASE_METADATA = {"has_mean": False, "has_sum": True, "source": DOMAIN}
+
+_DAY_METADATA = StatisticMetaData(
+    statistic_id=ENERGY_DAY_CONSUMPTION_KEY,
+    name="Energy consumption (day)",
+    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    **_BASE_METADATA,
+)
+_NIGHT_METADATA = StatisticMetaData(
+    statistic_id=ENERGY_NIGHT_CONSUMPTION_KEY,
+    name="Energy consumption (night)",
+    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    **_BASE_METADATA,
+)
+_TOTAL_METADATA = StatisticMetaData(
+    statistic_id=ENERGY_CONSUMPTION_KEY,
+    name="Energy consumption (total)",
+    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    **_BASE_METADATA,
+)
+_DAY_COST_METADATA = StatisticMetaData(
+    statistic_id=ENERGY_CONSUMPTION_COST_DAY_KEY,
+    name="Energy consumption cost (peak hours)",
+    unit_of_measurement=None,
+    **_BASE_METADATA,
+)
+_NIGHT_COST_METADATA = StatisticMetaData(
+    statistic_id=ENERGY_CONSUMPTION_COST_NIGHT_KEY,
+    name="Energy consumption cost (off-peak hours)",
+    unit_of_measurement=None,
+    **_BASE_METADATA,
+)
+
+# Getter of the ConsumptionData attribute feeding each statistic
+_STATISTICS = (
+    (attrgetter("day"), _DAY_METADATA),
+    (attrgetter("night"), _NIGHT_METADATA),
+    (attrgetter("total"), _TOTAL_METADATA),
+    (attrgetter("day_cost"), _DAY_COST_METADATA),
+    (attrgetter("night_cost"), _NIGHT_COST_METADATA),
+)
+
+STATISTIC_IDS = tuple(metadata["statistic_id"] for _, metadata in _STATISTICS)
 
-@dataclass
+
+def _merge_chunk_records(
+    chunks: Iterable[List[ConsumptionRecord]],
+) -> List[ConsumptionRecord]:
+    """Merge the records of every chunk, keeping one record per reading.
+
+    Chunks share their boundary, so the API can return the reading at a
+    boundary in both of them. Records without readings are left out, so an
+    empty copy can't take the place of a complete one.
+
+    Args:
+        chunks: The records of every chunk
+
+    Returns:
+        The records with readings, in the order they first appear in chunks
+    """
+    records: Dict[datetime, ConsumptionRecord] = {}
+    for chunk_records in chunks:
+        for record in chunk_records:
+            if record.get("readings_count"):
+                records.setdefault(record["from_"], record)
+    return list(records.values())
+
+
+@dataclass(slots=True, frozen=True)
 class ConsumptionData:
     """Class for holding consumption data."""
 
@@ -41,42 +136,57 @@ class ConsumptionData:
     to_date: datetime
     day: float = 0.0
     night: float = 0.0
-    day_cost: float = 0.0
-    night_cost: float = 0.0
     tickers: int = 0
+    # Total consumption (day + night), stored since it's read for every hour
+    total: float = field(init=False)
 
-    def get(self, property_name: str) -> Any:
-        """Get property value by name."""
-        return getattr(self, property_name)
+    def __post_init__(self) -> None:
+        """Compute the total consumption."""
+        object.__setattr__(self, "total", self.day + self.night)
 
     @property
-    def total(self) -> float:
-        """Total consumption (day + night)."""
-        return self.day + self.night
+    def day_cost(self) -> float:
+        """Cost of the consumption in peak hours."""
+        return self.day * DAILY_PRICE_CHF
+
+    @property
+    def night_cost(self) -> float:
+        """Cost of the consumption in off-peak hours."""
+        return self.night * NIGHTLY_PRICE_CHF
 
     @classmethod
-    def from_api_response(cls, data: ConsumptionResponse) -> List["ConsumptionData"]:
-        """Create ConsumptionData objects from API response.
+    def from_record(cls, record: ConsumptionRecord) -> "ConsumptionData":
+        """Create a ConsumptionData object from a single API record.
+
+        Args:
+            record: The consumption record
+
+        Returns:
+            The ConsumptionData object
+        """
+        return cls(
+            day=record.get("day") or 0.0,
+            night=record.get("night") or 0.0,
+            from_date=record["from_"],
+            to_date=record["to"],
+        )
+
+    @classmethod
+    def latest_from_api_response(
+        cls, data: ConsumptionResponse
+    ) -> Optional["ConsumptionData"]:
+        """Create a ConsumptionData object for the latest record with readings.
 
         Args:
             data: The API response containing consumption records
 
         Returns:
-            List of ConsumptionData objects
+            The latest ConsumptionData object or None if no record has readings
         """
-        statistics = []
-        for record in data.response:
-            # Skip records with no readings
-            if record.readings_count is not None and record.readings_count > 0:
-                statistics.append(
-                    cls(
-                        day=record.day,
-                        night=record.night,
-                        from_date=record.from_,
-                        to_date=record.to,
-                    )
-                )
-        return statistics
+        for record in reversed(data.response):
+            if record.get("readings_count"):
+                return cls.from_record(record)
+        return None
 
 
 class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData]]):
@@ -95,12 +205,19 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name=DOMAIN,
             # Ping the api every hour, so we provide the data as sensor, and we try to add statistic
             update_interval=timedelta(hours=DEFAULT_UPDATE_INTERVAL_HOUR),
         )
         self.api_client = client
         self.entry = entry
+        # Last (start, sum) of every series, read from the recorder and then
+        # kept up to date with what we insert, until it's read again
+        self._last_stats: Optional[Dict[str, Tuple[float, float]]] = None
+        self._last_stats_read_at = 0.0
+        # Concurrent backfill fetches share the client, log in one at a time
+        self._login_lock = asyncio.Lock()
 
     async def _async_setup(self) -> None:
         """Set up the coordinator by fetching historical data.
@@ -110,12 +227,9 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
         """
         _LOGGER.info("Setting up AIL Energy coordinator")
 
-        # Check if we already have statistics
-        last_stats = await get_instance(self.hass).async_add_executor_job(
-            get_last_statistics, self.hass, 1, ENERGY_CONSUMPTION_KEY, True, set()
-        )
-
-        if not last_stats:
+        # Check if we already have statistics, this also primes the cache used
+        # when inserting them
+        if not await self._async_get_cached_last_statistics():
             _LOGGER.info("No statistics found, fetching historical data")
             await self._fetch_historical_data()
         else:
@@ -131,17 +245,14 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
             ConfigEntryAuthFailed: If authentication fails
             UpdateFailed: If data cannot be fetched or processed
         """
-        if not await self.api_client.login():
-            raise ConfigEntryAuthFailed
-
         _from = datetime.now() - timedelta(days=CONSUMPTION_DATA_DAYS_TO_FETCH)
         _to = datetime.now()
-        response = await self.api_client.get_consumption_data(_from, _to)
-        consumption_data = ConsumptionData.from_api_response(response)
-        _LOGGER.debug("Updated consumption data: %s", consumption_data)
-
+        try:
+            response = await self._async_get_consumption_data(_from, _to)
+        except _FETCH_ERRORS as err:
+            raise UpdateFailed(f"Error fetching consumption data: {err}") from err
         # Process hourly consumptions
-        hourly_data = self._sum_hourly_consumptions(consumption_data)
+        hourly_data = self._sum_hourly_consumptions(response.response)
 
         # Handle empty consumption_stats array
         if not hourly_data:
@@ -151,9 +262,9 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
         await self._insert_statistics(hourly_data)
 
         # Return the most recent consumption data if available
-        if consumption_data:
-            return consumption_data[-1]
-        return None
+        latest = ConsumptionData.latest_from_api_response(response)
+        _LOGGER.debug("Updated consumption data: %s", latest)
+        return latest
 
     async def _fetch_historical_data(self) -> None:
         """Fetch historical data for the past 90 days.
@@ -166,30 +277,46 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
         start_date = end_date - timedelta(days=90)  # last 3 months
 
         chunk_size = timedelta(days=4)
+        chunks = []
         chunk_start = start_date
-
-        if not await self.api_client.login():
-            raise ConfigEntryAuthFailed
-
-        all_consumption_data: Dict[datetime, ConsumptionData] = {}
         while chunk_start < end_date:
             chunk_end = min(chunk_start + chunk_size, end_date)
-            _LOGGER.debug("Fetching data from %s to %s", chunk_start, chunk_end)
-            try:
-                response = await self.api_client.get_consumption_data(
-                    chunk_start, chunk_end
-                )
-                consumption_data = ConsumptionData.from_api_response(response)
-                hourly_data = self._sum_hourly_consumptions(consumption_data)
-                _LOGGER.debug("Found %d hourly records", len(hourly_data))
-                all_consumption_data.update(hourly_data)
-            except Exception as err:
-                _LOGGER.error(
-                    "Error fetching chunk %s to %s: %s", chunk_start, chunk_end, err
-                )
-            # Move to next chunk regardless of success to try to get as much data as possible
+            chunks.append((chunk_start, chunk_end))
             chunk_start = chunk_end
 
+        if not self.api_client.logged_in:
+            await self._async_login()
+
+        # Overlap a few requests at a time, without hammering the API
+        semaphore = asyncio.Semaphore(HISTORICAL_DATA_MAX_CONCURRENT_REQUESTS)
+
+        async def _fetch_chunk(
+            chunk_start: datetime, chunk_end: datetime
+        ) -> List[ConsumptionRecord]:
+            async with semaphore:
+                _LOGGER.debug("Fetching data from %s to %s", chunk_start, chunk_end)
+                try:
+                    response = await self._async_get_consumption_data(
+                        chunk_start, chunk_end
+                    )
+                except _FETCH_ERRORS as err:
+                    # Skip the chunk, to try to get as much data as possible
+                    _LOGGER.error(
+                        "Error fetching chunk %s to %s: %s", chunk_start, chunk_end, err
+                    )
+                    return []
+            _LOGGER.debug("Found %d records", len(response.response))
+            return response.response
+
+        # gather() keeps the chunks order, so readings stay chronological
+        chunk_records = await asyncio.gather(
+            *(_fetch_chunk(chunk_start, chunk_end) for chunk_start, chunk_end in chunks)
+        )
+        records = _merge_chunk_records(chunk_records)
+
+        # Aggregate every chunk in a single pass
+        all_consumption_data = self._sum_hourly_consumptions(records)
+
         if all_consumption_data:
             _LOGGER.info(
                 "Inserting %d historical data points", len(all_consumption_data)
@@ -198,53 +325,107 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
         else:
             _LOGGER.warning("No historical consumption data was retrieved")
 
+    async def _async_login(self) -> None:
+        """Log in to the API, unless a concurrent call already did.
+
+        Raises:
+            ConfigEntryAuthFailed: If authentication fails
+        """
+        async with self._login_lock:
+            # Another fetch may have logged in while we were waiting
+            if self.api_client.logged_in:
+                return
+            if not await self.api_client.login():
+                raise ConfigEntryAuthFailed
+
+    async def _async_get_consumption_data(
+        self, _from: datetime, _to: datetime
+    ) -> ConsumptionResponse:
+        """Fetch consumption data, logging in only when the token is not valid.
+
+        Raises:
+            ConfigEntryAuthFailed: If authentication fails
+        """
+        if not self.api_client.logged_in:
+            await self._async_login()
+
+        try:
+            return await self.api_client.get_consumption_data(_from, _to)
+        except AuthExpired:
+            _LOGGER.debug("Token rejected, logging in again")
+            await self._async_login()
+            return await self.api_client.get_consumption_data(_from, _to)
+
     def _sum_hourly_consumptions(
         self,
-        consumptions: List[ConsumptionData],
+        records: List[ConsumptionRecord],
     ) -> Dict[datetime, ConsumptionData]:
-        """Sum consumption records into hourly buckets.
+        """Sum API consumption records into hourly buckets.
+
+        Records are aggregated as they are, without building a ConsumptionData
+        object for each of them.
 
         Args:
-            consumptions: List of consumption data records
+            records: Consumption records from the API response
 
         Returns:
-            Dictionary mapping hour start times to summed consumption data
+            Dictionary mapping hour start times to summed consumption data, in
+            the order the hours first appear in records
         """
-        if not consumptions:
-            return {}
-
-        hourly_sums: Dict[datetime, ConsumptionData] = {}
-        for consumption in consumptions:
-            hour_key = consumption.from_date.replace(minute=0, second=0, microsecond=0)
-            if hour_key not in hourly_sums:
-                hourly_sums[hour_key] = ConsumptionData(
-                    from_date=hour_key,
-                    to_date=hour_key + timedelta(hours=1),
-                )
+        fixed_tariff = self.entry.options.get(CONF_FIXED_TARIFF)
 
-            current = hourly_sums[hour_key]
+        # ConsumptionData is immutable, accumulate [day, night, tickers] per hour
+        hourly_sums: Dict[datetime, list] = {}
+        current = hour_key = hour_end = slot = None
+        for record in records:
+            # Skip records with no readings
+            if not record.get("readings_count"):
+                continue
 
-            if self.entry.options.get(CONF_FIXED_TARIFF):
-                current.day += consumption.day
-            else:
+            day = record.get("day") or 0.0
+            from_date = record["from_"]
+            # Readings come in chronological order, so only build the hour key
+            # and look the bucket up when the hour changes
+            if current is None or not hour_key <= from_date < hour_end:
+                hour_key = from_date.replace(minute=0, second=0, microsecond=0)
+                hour_end = hour_key + timedelta(hours=1)
+                current = hourly_sums.get(hour_key)
+                if current is None:
+                    current = hourly_sums[hour_key] = [0.0, 0.0, 0]
                 # https://www.ail.ch/privati/elettricita/servizi/tariffe.html
                 # between 22:00 and 06:00 is considered night (off-peak hours)
                 # between 06:00 and 22:00 is considered day (peak hours)
-                if 22 <= current.from_date.hour or current.from_date.hour < 6:
-                    current.night += consumption.day
+                # The whole hour has the same tariff, pick the slot once
+                if not fixed_tariff and (22 <= hour_key.hour or hour_key.hour < 6):
+                    slot = 1
                 else:
-                    current.day += consumption.day
+                    slot = 0
 
-            current.tickers += 1
+            current[slot] += day
+            current[2] += 1
 
         # filter all hours that have less than 4 tickers (ensures complete data)
-        return {k: v for k, v in hourly_sums.items() if v.tickers >= 4}
+        return {
+            hour: ConsumptionData(
+                from_date=hour,
+                to_date=hour + timedelta(hours=1),
+                day=day,
+                night=night,
+                tickers=tickers,
+            )
+            for hour, (day, night, tickers) in hourly_sums.items()
+            if tickers >= 4
+        }
 
     async def _insert_statistics(
         self, consumptions: Dict[datetime, ConsumptionData]
     ) -> None:
         """Insert consumption data into Home Assistant statistics.
 
+        Hours are sorted first: running sums and the cutoff of hours already
+        stored both rely on chronological order. Readings usually come in
+        order already, which makes the sort cheap.
+
         Args:
             consumptions: Dictionary mapping hour start times to consumption data
         """
@@ -252,120 +433,120 @@ class EnergyDataUpdateCoordinator(DataUpdateCoordinator[Optional[ConsumptionData
             _LOGGER.debug("No consumption data to process")
             return
 
-        # Calculate cost for each hour
-        for consumption in consumptions.values():
-            consumption.day_cost = consumption.day * DAILY_PRICE_CHF
-            consumption.night_cost = consumption.night * NIGHTLY_PRICE_CHF
-
-        # Process day and night consumption separately
-        await self._insert_statistic_type(
-            consumptions,
-            "day",
-            ENERGY_DAY_CONSUMPTION_KEY,
-            "Energy consumption (day)",
-            metadata={
-                "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
-            },
-        )
-        await self._insert_statistic_type(
-            consumptions,
-            "night",
-            ENERGY_NIGHT_CONSUMPTION_KEY,
-            "Energy consumption (night)",
-            metadata={
-                "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
-            },
-        )
-        await self._insert_statistic_type(
-            consumptions,
-            "total",
-            ENERGY_CONSUMPTION_KEY,
-            "Energy consumption (total)",
-            metadata={
-                "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
-            },
-        )
-        await self._insert_statistic_type(
-            consumptions,
-            "day_cost",
-            ENERGY_CONSUMPTION_COST_DAY_KEY,
-            "Energy consumption cost (peak hours)",
-            metadata={
-                "unit_of_measurement": None,
-            },
-        )
-        await self._insert_statistic_type(
-            consumptions,
-            "night_cost",
-            ENERGY_CONSUMPTION_COST_NIGHT_KEY,
-            "Energy consumption cost (off-peak hours)",
-            metadata={
-                "unit_of_measurement": None,
-            },
-        )
+        # Build every series first, then submit them back-to-back so the
+        # recorder gets all of them queued together
+        last_stats = await self._async_get_cached_last_statistics()
+        hours = sorted(consumptions)
+        # Convert hours to timestamps once, not once per series
+        timestamps = [hour.timestamp() for hour in hours]
+
+        # Skip the work when every series already has the newest hour
+        if all(
+            statistic_id in last_stats and last_stats[statistic_id][0] >= timestamps[-1]
+            for statistic_id in STATISTIC_IDS
+        ):
+            _LOGGER.debug("No new hours to add to the statistics")
+            return
 
-    async def _insert_statistic_type(
+        batches = [
+            self._prepare_statistic_type(
+                consumptions, hours, timestamps, last_stats, getter, metadata
+            )
+            for getter, metadata in _STATISTICS
+        ]
+
+        for metadata, statistics in batches:
+            if statistics:
+                async_add_external_statistics(self.hass, metadata, statistics)
+                last_stats[metadata["statistic_id"]] = (
+                    statistics[-1]["start"].timestamp(),
+                    statistics[-1]["sum"],
+                )
+                _LOGGER.debug(
+                    "Added %d statistics for %s", len(statistics), metadata["name"]
+                )
+
+    async def _async_get_cached_last_statistics(
         self,
-        consumptions: Dict[datetime, ConsumptionData],
-        data_type: str,
-        statistic_id: str,
-        name: str,
-        metadata: dict = None,
-    ) -> None:
-        """Insert a specific type of statistic (day/night) into Home Assistant.
+    ) -> Dict[str, Tuple[float, float]]:
+        """Get the last statistic of every series, reading them when needed.
 
-        Args:
-            consumptions: Dictionary mapping hour start times to consumption data
-            data_type: The type of data to insert ("day", "night" or "total")
-            statistic_id: The statistic ID to use
-            name: The display name for the statistic
+        The cache is used right after setup, while the statistics inserted by
+        the backfill may not be committed yet. Updates are further apart, so
+        they read the statistics again and see any that were cleared.
+
+        Returns:
+            Dictionary mapping statistic IDs to their last (start, sum), series
+            without statistics are left out
         """
-        # Get last statistics time in a single query
-        last_stat = await get_instance(self.hass).async_add_executor_job(
-            get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
-        )
+        if (
+            self._last_stats is None
+            or time.monotonic() - self._last_stats_read_at
+            > _LAST_STATS_MAX_AGE.total_seconds()
+        ):
+            self._last_stats = await self._async_get_last_statistics()
+            self._last_stats_read_at = time.monotonic()
+        return self._last_stats
 
-        last_stats_time = (
-            last_stat[statistic_id][0]["start"]
-            if last_stat and statistic_id in last_stat
-            else None
-        )
+    async def _async_get_last_statistics(self) -> Dict[str, Tuple[float, float]]:
+        """Get the start time and sum of the last statistic of every series.
 
-        sum_value = (
-            last_stat[statistic_id][0]["sum"]
-            if last_stat and statistic_id in last_stat
-            else 0.0
-        )
-        statistics = []
+        All series are read in a single executor job.
 
-        # Prepare statistics for each hour
-        for hour, consumption in consumptions.items():
-            # Skip hours that are already processed
-            if last_stats_time and hour.timestamp() <= last_stats_time:
-                continue
+        Returns:
+            Dictionary mapping statistic IDs to their last (start, sum), series
+            without statistics are left out
+        """
 
-            value = getattr(consumption, data_type)
-            sum_value += value
-            statistics.append(
-                StatisticData(
-                    start=hour,
-                    state=value,
-                    sum=sum_value,
+        def _get_last_statistics() -> Dict[str, Tuple[float, float]]:
+            last_stats = {}
+            for statistic_id in STATISTIC_IDS:
+                last_stat = get_last_statistics(
+                    self.hass, 1, statistic_id, True, {"sum"}
                 )
-            )
+                if last_stat and statistic_id in last_stat:
+                    row = last_stat[statistic_id][0]
+                    last_stats[statistic_id] = (row["start"], row["sum"])
+            return last_stats
 
-        base_metadata = {
-            "has_mean": False,
-            "has_sum": True,
-            "source": DOMAIN,
-            **metadata,
-        }
+        return await get_instance(self.hass).async_add_executor_job(
+            _get_last_statistics
+        )
 
-        if statistics:
-            metadata = StatisticMetaData(
-                statistic_id=statistic_id,
-                name=name,
-                **base_metadata,
-            )
-            async_add_external_statistics(self.hass, metadata, statistics)
-            _LOGGER.debug("Added %d statistics for %s", len(statistics), name)
+    def _prepare_statistic_type(
+        self,
+        consumptions: Dict[datetime, ConsumptionData],
+        hours: List[datetime],
+        timestamps: List[float],
+        last_stats: Dict[str, Tuple[float, float]],
+        getter: Callable[[ConsumptionData], float],
+        metadata: StatisticMetaData,
+    ) -> Tuple[StatisticMetaData, List[StatisticData]]:
+        """Prepare a specific type of statistic (day/night) for Home Assistant.
+
+        Args:
+            consumptions: Dictionary mapping hour start times to consumption data
+            hours: The hours in consumptions, in chronological order
+            timestamps: POSIX timestamps of hours
+            last_stats: Last (start, sum) of every series with statistics
+            getter: Returns the value to insert ("day", "night", ...) of an hour
+            metadata: The metadata of the statistic
+
+        Returns:
+            The statistic metadata and the statistics newer than the last one stored
+        """
+        statistic_id = metadata["statistic_id"]
+        last_stats_time, sum_value = last_stats.get(statistic_id, (None, 0.0))
+        # Skip hours that are already processed, they're all before the first new one
+        start = bisect_right(timestamps, last_stats_time) if last_stats_time else 0
+        new_hours = hours[start:]
+        values = [getter(consumptions[hour]) for hour in new_hours]
+        # Running sums continue from the last stored one
+        sums = islice(accumulate(values, initial=sum_value), 1, None)
+
+        # StatisticData is a TypedDict, a dict literal skips the constructor call
+        statistics: List[StatisticData] = [
+            {"start": hour, "state": value, "sum": total}
+            for hour, value, total in zip(new_hours, values, sums)
+        ]
+        return metadata, statistics
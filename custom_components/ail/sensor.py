@@ -1,23 +1,25 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime
+from operator import attrgetter
 from typing import Callable, Optional
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorStateClass,
-    SensorEntity,
     SensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from custom_components.ail import DOMAIN
-from custom_components.ail.const import DAILY_PRICE_CHF, NIGHTLY_PRICE_CHF
+from custom_components.ail.const import DAILY_PRICE_CHF, DOMAIN, NIGHTLY_PRICE_CHF
 from custom_components.ail.coordinator import (
     ConsumptionData,
     EnergyDataUpdateCoordinator,
@@ -42,7 +44,7 @@ SENSORS: tuple[EnergyEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=2,
         icon="mdi:weather-sunny",
-        value_fn=lambda data: data.day if data else None,
+        value_fn=attrgetter("day"),
     ),
     EnergyEntityDescription(
         key="night",
@@ -52,7 +54,7 @@ SENSORS: tuple[EnergyEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=2,
         icon="mdi:weather-night",
-        value_fn=lambda data: data.night if data else None,
+        value_fn=attrgetter("night"),
     ),
     EnergyEntityDescription(
         key="total",
@@ -62,7 +64,7 @@ SENSORS: tuple[EnergyEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=2,
         icon="mdi:chart-timeline-variant",
-        value_fn=lambda data: (data.day + data.night) if data else None,
+        value_fn=attrgetter("total"),
     ),
     EnergyEntityDescription(
         key="cost",
@@ -85,15 +87,27 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up AIL energy sensors based on config entry."""
-    coordinator: EnergyDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: EnergyDataUpdateCoordinator = entry.runtime_data.coordinator
+
+    # Every sensor belongs to the same device, share a single device info
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name="AIL Energy Consumption",
+        manufacturer="AIL Lugano",
+        model="Energy Buddy",
+        sw_version="1.0",
+        via_device=None,
+    )
 
     # Create all sensors from the SENSORS description tuple
-    entities = [EnergySensor(coordinator, description) for description in SENSORS]
+    entities = [
+        EnergySensor(coordinator, description, device_info) for description in SENSORS
+    ]
 
     async_add_entities(entities)
 
 
-class EnergySensor(CoordinatorEntity[EnergyDataUpdateCoordinator], SensorEntity):
+class EnergySensor(CoordinatorEntity[EnergyDataUpdateCoordinator], RestoreSensor):
     """Sensor for AIL energy consumption."""
 
     _attr_has_entity_name = True
@@ -102,38 +116,46 @@ class EnergySensor(CoordinatorEntity[EnergyDataUpdateCoordinator], SensorEntity)
         self,
         coordinator: EnergyDataUpdateCoordinator,
         description: EnergyEntityDescription,
+        device_info: DeviceInfo,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self.entity_description = description
         self._attr_unique_id = f"{DOMAIN}_energy_{description.key}"
-        self._attr_name = description.name
-        self._attr_state_class = description.state_class
-        self._attr_device_class = description.device_class
-        self._attr_suggested_display_precision = description.suggested_display_precision
-        self._attr_native_unit_of_measurement = description.native_unit_of_measurement
-        self._attr_icon = description.icon
-
-        # Add device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, coordinator.entry.entry_id)},
-            "name": "AIL Energy Consumption",
-            "manufacturer": "AIL Lugano",
-            "model": "Energy Buddy",
-            "sw_version": "1.0",
-            "via_device": None,
-        }
-
-    @property
-    def native_value(self) -> StateType:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-        return self.entity_description.value_fn(self.coordinator.data)
-
-    @property
-    def last_reset(self) -> Optional[datetime]:
-        """Return the time when the sensor was last reset, if any."""
-        if not self.coordinator.data:
-            return None
-        return self.coordinator.data.from_date
+        self._attr_device_info = device_info
+        self._last_to_date: Optional[datetime] = None
+        self._update_attrs()
+
+    def _update_attrs(self) -> None:
+        """Update the attributes from the coordinator data."""
+        if data := self.coordinator.data:
+            self._attr_native_value = self.entity_description.value_fn(data)
+            # Each reading is a new interval, it resets at the start of it
+            self._attr_last_reset = data.from_date
+            # Keep the same attributes until a newer reading comes in
+            if data.to_date != self._last_to_date:
+                self._attr_extra_state_attributes = {"last_update": data.to_date}
+                self._last_to_date = data.to_date
+        else:
+            # No reading, the state is unknown like before it was cached. The
+            # value restored after a restart is set later, on being added.
+            self._attr_native_value = None
+            self._attr_last_reset = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known state while the coordinator has no data."""
+        await super().async_added_to_hass()
+        if self.coordinator.data:
+            return
+
+        if (last_sensor_data := await self.async_get_last_sensor_data()) is not None:
+            self._attr_native_value = last_sensor_data.native_value
+        if (last_state := await self.async_get_last_state()) is not None:
+            if last_reset := last_state.attributes.get("last_reset"):
+                self._attr_last_reset = dt_util.parse_datetime(last_reset)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_attrs()
+        super()._handle_coordinator_update()
@@ -0,0 +1,100 @@
+"""Test the login page parsers and the token handling of the API client."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.ail.api_client import (
+    AILEnergyClient,
+    AuthExpired,
+    _extract_meter_id,
+    _extract_token,
+)
+
+LOGIN_PAGE = (
+    b'<script>aWattgarde.config.tokenUrl = "/token";\n'
+    b'aWattgarde.config.token = "secret-token";</script>\n'
+    b'<script>var meter = {"ID": null}; var meters = [{"ID": 1234, "Name": "x"}];'
+    b"</script>"
+)
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b'aWattgarde.config.token = "abc";', "abc"),
+        (b'aWattgarde.config.token="abc";', "abc"),
+        (b'aWattgarde.config.tokenUrl = "/x"; aWattgarde.config.token="tok"', "tok"),
+        (b'aWattgarde.config.token = ""; aWattgarde.config.token = "tok"', "tok"),
+        (b'aWattgarde.config.token = "abc', None),
+        (b"no token here", None),
+    ],
+)
+def test_extract_token(content, expected):
+    """Test the token is found in the first occurrence that matches."""
+    assert _extract_token(content) == expected
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b'{"ID": 1234}', "1234"),
+        (b'{"ID":1234,"Name":"x"}', "1234"),
+        (b'{"ID": null} {"ID": 99,}', "99"),
+        (b'{"ID": "abc"} {"ID": 7}', "7"),
+        (b'{"ID": 1234', None),
+        (b"no meter here", None),
+    ],
+)
+def test_extract_meter_id(content, expected):
+    """Test the meter ID is found in the first occurrence that is a number."""
+    assert _extract_meter_id(content) == expected
+
+
+def test_extract_from_partial_page():
+    """Test a page cut anywhere never yields a truncated value."""
+    for end in range(len(LOGIN_PAGE)):
+        assert _extract_token(LOGIN_PAGE[:end]) in (None, "secret-token")
+        assert _extract_meter_id(LOGIN_PAGE[:end]) in (None, "1234")
+
+    assert _extract_token(LOGIN_PAGE) == "secret-token"
+    assert _extract_meter_id(LOGIN_PAGE) == "1234"
+
+
+async def test_concurrent_rejected_tokens():
+    """Test a 401 for an old token keeps the token of a newer login."""
+    first, second = asyncio.Event(), asyncio.Event()
+    gates = iter((first, second))
+
+    @asynccontextmanager
+    async def post(*args, **kwargs):
+        await next(gates).wait()
+        yield MagicMock(status=401)
+
+    client = AILEnergyClient("user", "pass", MagicMock(post=post))
+    client.token, client.meter_id = "old-token", "1234"
+    client._token_acquired_at = time.monotonic()
+    _from, _to = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+    fetches = [
+        asyncio.create_task(client.get_consumption_data(_from, _to)) for _ in range(2)
+    ]
+    # Let both requests go out with the old token
+    await asyncio.sleep(0)
+
+    first.set()
+    with pytest.raises(AuthExpired):
+        await fetches[0]
+    assert client.token is None
+
+    # Log in again while the second request is still waiting for its 401
+    client.token = "new-token"
+    client._token_acquired_at = time.monotonic()
+    second.set()
+    with pytest.raises(AuthExpired):
+        await fetches[1]
+    assert client.token == "new-token"
@@ -0,0 +1,303 @@
+"""Test fetching the consumption, its aggregation and the statistics import."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ail.api_client import AuthExpired
+from custom_components.ail.const import (
+    CONF_FIXED_TARIFF,
+    DOMAIN,
+    ENERGY_DAY_CONSUMPTION_KEY,
+)
+from custom_components.ail.coordinator import (
+    _DAY_METADATA,
+    _LAST_STATS_MAX_AGE,
+    STATISTIC_IDS,
+    ConsumptionData,
+    EnergyDataUpdateCoordinator,
+    _merge_chunk_records,
+)
+
+HOUR = timedelta(hours=1)
+
+
+def _coordinator(hass, **options) -> EnergyDataUpdateCoordinator:
+    """Create a coordinator with a mocked API client."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={"username": "user", "password": "pass"}, options=options
+    )
+    entry.add_to_hass(hass)
+    return EnergyDataUpdateCoordinator(hass, entry, MagicMock())
+
+
+def _records(start: datetime, count: int, day: float = 1.0) -> list[dict]:
+    """Build count quarter-hour records starting at start."""
+    return [
+        {
+            "from_": start + timedelta(minutes=15 * i),
+            "to": start + timedelta(minutes=15 * (i + 1)),
+            "day": day,
+            "is_pending": False,
+            "readings_count": 1,
+        }
+        for i in range(count)
+    ]
+
+
+def _consumptions(start: datetime, values: list[float]) -> dict:
+    """Build hourly consumption data with the given day values."""
+    return {
+        start + i * HOUR: ConsumptionData(
+            from_date=start + i * HOUR, to_date=start + (i + 1) * HOUR, day=value
+        )
+        for i, value in enumerate(values)
+    }
+
+
+def _mock_login(client: MagicMock, success: bool = True) -> None:
+    """Mock a login that keeps the client logged in when it succeeds."""
+
+    async def login() -> bool:
+        client.logged_in = success
+        return success
+
+    client.login = AsyncMock(side_effect=login)
+
+
+def _mock_rejected_token(client: MagicMock, response: MagicMock) -> None:
+    """Mock the API rejecting the token until the client logs in again."""
+
+    async def get_consumption_data(*_) -> MagicMock:
+        # The token is sent now, the answer comes once other fetches had a go
+        logins = client.login.await_count
+        await asyncio.sleep(0)
+        if not logins:
+            # A rejected token logs the client out, unless it logged in again
+            if client.login.await_count == logins:
+                client.logged_in = False
+            raise AuthExpired("Token rejected with status code: 401")
+        return response
+
+    client.get_consumption_data = AsyncMock(side_effect=get_consumption_data)
+
+
+async def test_get_consumption_data_reuses_token(hass):
+    """Test a valid token is used without logging in again."""
+    coordinator = _coordinator(hass)
+    client = coordinator.api_client
+    client.logged_in = True
+    _mock_login(client)
+    client.get_consumption_data = AsyncMock()
+    _from, _to = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+    response = await coordinator._async_get_consumption_data(_from, _to)
+
+    assert response is client.get_consumption_data.return_value
+    client.get_consumption_data.assert_awaited_once_with(_from, _to)
+    client.login.assert_not_awaited()
+
+
+async def test_get_consumption_data_logs_in_after_401(hass):
+    """Test a rejected token is replaced by logging in again."""
+    coordinator = _coordinator(hass)
+    client = coordinator.api_client
+    client.logged_in = True
+    _mock_login(client)
+    response = MagicMock()
+    _mock_rejected_token(client, response)
+
+    assert (
+        await coordinator._async_get_consumption_data(
+            datetime(2025, 1, 1), datetime(2025, 1, 2)
+        )
+        is response
+    )
+    client.login.assert_awaited_once()
+    assert client.get_consumption_data.await_count == 2
+
+
+async def test_get_consumption_data_login_fails(hass):
+    """Test the credentials are reported invalid when logging in again fails."""
+    coordinator = _coordinator(hass)
+    client = coordinator.api_client
+    client.logged_in = True
+    _mock_login(client, success=False)
+    _mock_rejected_token(client, MagicMock())
+
+    with pytest.raises(ConfigEntryAuthFailed):
+        await coordinator._async_get_consumption_data(
+            datetime(2025, 1, 1), datetime(2025, 1, 2)
+        )
+
+    client.login.assert_awaited_once()
+    client.get_consumption_data.assert_awaited_once()
+
+
+async def test_get_consumption_data_concurrent_401(hass):
+    """Test concurrent fetches with a rejected token log in only once."""
+    coordinator = _coordinator(hass)
+    client = coordinator.api_client
+    client.logged_in = True
+    _mock_login(client)
+    response = MagicMock()
+    _mock_rejected_token(client, response)
+    _from, _to = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+    responses = await asyncio.gather(
+        coordinator._async_get_consumption_data(_from, _to),
+        coordinator._async_get_consumption_data(_from, _to),
+    )
+
+    assert responses == [response, response]
+    client.login.assert_awaited_once()
+    assert client.get_consumption_data.await_count == 4
+
+
+async def test_sum_hourly_consumptions_day_and_night(hass):
+    """Test readings go to the night slot between 22:00 and 06:00."""
+    coordinator = _coordinator(hass)
+    start = datetime(2025, 1, 1, 5)
+
+    hourly = coordinator._sum_hourly_consumptions(_records(start, 8))
+
+    assert list(hourly) == [start, start + HOUR]
+    assert (hourly[start].day, hourly[start].night) == (0.0, 4.0)
+    assert (hourly[start + HOUR].day, hourly[start + HOUR].night) == (4.0, 0.0)
+
+
+async def test_sum_hourly_consumptions_fixed_tariff(hass):
+    """Test every reading goes to the day slot with a fixed tariff."""
+    coordinator = _coordinator(hass, **{CONF_FIXED_TARIFF: True})
+    start = datetime(2025, 1, 1, 5)
+
+    hourly = coordinator._sum_hourly_consumptions(_records(start, 4))
+
+    assert (hourly[start].day, hourly[start].night) == (4.0, 0.0)
+
+
+async def test_sum_hourly_consumptions_incomplete_hours(hass):
+    """Test hours with less than 4 readings are left out."""
+    coordinator = _coordinator(hass)
+    start = datetime(2025, 1, 1, 10)
+    records = _records(start, 7)
+    records.append({**records[-1], "readings_count": None})
+
+    hourly = coordinator._sum_hourly_consumptions(records)
+
+    assert list(hourly) == [start]
+    assert hourly[start].tickers == 4
+
+
+async def test_sum_hourly_consumptions_overlapping_chunks(hass):
+    """Test a reading returned by two chunks is only counted once."""
+    coordinator = _coordinator(hass)
+    midnight = datetime(2025, 1, 2)
+    first_chunk = _records(midnight - 2 * HOUR, 9)
+    second_chunk = _records(midnight, 4)
+
+    records = _merge_chunk_records([first_chunk, second_chunk])
+    hourly = coordinator._sum_hourly_consumptions(records)
+
+    assert len(records) == 12
+    assert list(hourly) == [midnight - 2 * HOUR, midnight - HOUR, midnight]
+    assert hourly[midnight].night == 4.0
+    assert hourly[midnight].tickers == 4
+
+
+async def test_sum_hourly_consumptions_empty_boundary_copy(hass):
+    """Test a boundary copy without readings doesn't hide the complete one."""
+    coordinator = _coordinator(hass)
+    midnight = datetime(2025, 1, 2)
+    first_chunk = _records(midnight - HOUR, 5)
+    first_chunk[-1] = {**first_chunk[-1], "readings_count": None}
+    second_chunk = _records(midnight, 4)
+
+    records = _merge_chunk_records([first_chunk, second_chunk])
+    hourly = coordinator._sum_hourly_consumptions(records)
+
+    assert list(hourly) == [midnight - HOUR, midnight]
+    assert hourly[midnight].tickers == 4
+
+
+async def test_prepare_statistic_type_from_cached_sum(hass):
+    """Test only hours after the cached start are added, continuing its sum."""
+    coordinator = _coordinator(hass)
+    consumptions = _consumptions(datetime(2025, 1, 1, 10), [1.0, 2.0, 3.0])
+    hours = list(consumptions)
+    timestamps = [hour.timestamp() for hour in hours]
+    last_stats = {ENERGY_DAY_CONSUMPTION_KEY: (timestamps[0], 10.0)}
+
+    metadata, statistics = coordinator._prepare_statistic_type(
+        consumptions,
+        hours,
+        timestamps,
+        last_stats,
+        lambda data: data.day,
+        _DAY_METADATA,
+    )
+
+    assert metadata is _DAY_METADATA
+    assert statistics == [
+        {"start": hours[1], "state": 2.0, "sum": 12.0},
+        {"start": hours[2], "state": 3.0, "sum": 15.0},
+    ]
+
+
+async def test_insert_statistics_up_to_date(hass):
+    """Test nothing is added when every series has the newest hour."""
+    coordinator = _coordinator(hass)
+    consumptions = _consumptions(datetime(2025, 1, 1, 10), [1.0, 2.0])
+    newest = (datetime(2025, 1, 1, 11).timestamp(), 3.0)
+    coordinator._async_get_last_statistics = AsyncMock(
+        return_value=dict.fromkeys(STATISTIC_IDS, newest)
+    )
+
+    with patch(
+        "custom_components.ail.coordinator.async_add_external_statistics"
+    ) as add_statistics:
+        await coordinator._insert_statistics(consumptions)
+
+    add_statistics.assert_not_called()
+
+
+async def test_insert_statistics_out_of_order(hass):
+    """Test hours are added in chronological order and the cache is updated."""
+    coordinator = _coordinator(hass)
+    start = datetime(2025, 1, 1, 10)
+    consumptions = dict(reversed(_consumptions(start, [1.0, 2.0, 3.0]).items()))
+    coordinator._async_get_last_statistics = AsyncMock(return_value={})
+
+    with patch(
+        "custom_components.ail.coordinator.async_add_external_statistics"
+    ) as add_statistics:
+        await coordinator._insert_statistics(consumptions)
+
+    assert add_statistics.call_count == len(STATISTIC_IDS)
+    _, metadata, statistics = add_statistics.call_args_list[0].args
+    assert metadata["statistic_id"] == ENERGY_DAY_CONSUMPTION_KEY
+    assert [row["sum"] for row in statistics] == [1.0, 3.0, 6.0]
+    assert coordinator._last_stats[ENERGY_DAY_CONSUMPTION_KEY] == (
+        (start + 2 * HOUR).timestamp(),
+        6.0,
+    )
+
+
+async def test_last_statistics_read_again_when_old(hass):
+    """Test the cached last statistics are read again once they're old."""
+    coordinator = _coordinator(hass)
+    stored = {ENERGY_DAY_CONSUMPTION_KEY: (datetime(2025, 1, 1, 10).timestamp(), 1.0)}
+    coordinator._async_get_last_statistics = AsyncMock(return_value=stored)
+    assert await coordinator._async_get_cached_last_statistics() == stored
+
+    # Statistics cleared from the recorder
+    coordinator._async_get_last_statistics.return_value = {}
+    assert await coordinator._async_get_cached_last_statistics() == stored
+
+    coordinator._last_stats_read_at -= _LAST_STATS_MAX_AGE.total_seconds() + 1
+    assert await coordinator._async_get_cached_last_statistics() == {}
+    assert coordinator._async_get_last_statistics.await_count == 2
@@ -0,0 +1,95 @@
+"""Test the AIL energy sensors."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.ail.const import DOMAIN
+from custom_components.ail.coordinator import (
+    ConsumptionData,
+    EnergyDataUpdateCoordinator,
+)
+from custom_components.ail.sensor import SENSORS, EnergySensor
+
+
+def _sensor(data: ConsumptionData | None) -> EnergySensor:
+    """Create the day sensor for a coordinator holding data."""
+    coordinator = MagicMock()
+    coordinator.data = data
+    return EnergySensor(coordinator, SENSORS[0], DeviceInfo())
+
+
+async def test_update_without_data(hass):
+    """Test the state becomes unknown when an update has no reading."""
+    start = datetime(2025, 1, 1, 10)
+    sensor = _sensor(
+        ConsumptionData(from_date=start, to_date=datetime(2025, 1, 1, 11), day=1.5)
+    )
+    assert sensor.native_value == 1.5
+    assert sensor.last_reset == start
+
+    sensor.coordinator.data = None
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+
+    assert sensor.native_value is None
+    assert sensor.last_reset is None
+
+
+async def test_restore_state(recorder_mock, hass):
+    """Test the last state is kept until the first coordinator update."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={"username": "user", "password": "pass"}
+    )
+    entry.add_to_hass(hass)
+    # Register the entity first, so the cached state is found under its ID
+    registry_entry = er.async_get(hass).async_get_or_create(
+        "sensor", DOMAIN, f"{DOMAIN}_energy_day", config_entry=entry
+    )
+    entity_id = registry_entry.entity_id
+    last_reset = datetime(2025, 1, 1, 10, tzinfo=dt_util.UTC)
+    mock_restore_cache_with_extra_data(
+        hass,
+        (
+            (
+                State(entity_id, "1.5", {"last_reset": last_reset.isoformat()}),
+                {"native_value": 1.5, "native_unit_of_measurement": "kWh"},
+            ),
+        ),
+    )
+
+    # Start without any reading, like when the API can't be reached
+    with (
+        patch.object(EnergyDataUpdateCoordinator, "_async_setup"),
+        patch.object(
+            EnergyDataUpdateCoordinator, "_async_update_data", return_value=None
+        ),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        state = hass.states.get(entity_id)
+        assert state.state == "1.5"
+        assert state.attributes["last_reset"] == last_reset.isoformat()
+
+        start = datetime(2025, 1, 2, 10, tzinfo=dt_util.UTC)
+        entry.runtime_data.coordinator.async_set_updated_data(
+            ConsumptionData(
+                from_date=start, to_date=start + timedelta(hours=1), day=2.5
+            )
+        )
+        await hass.async_block_till_done()
+
+        state = hass.states.get(entity_id)
+        assert state.state == "2.5"
+        assert state.attributes["last_reset"] == start.isoformat()
+
+        assert await hass.config_entries.async_unload(entry.entry_id)